@@ -22,8 +22,12 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
+import ast
+import asyncio
+import operator
 import os
-import re
+import threading
+from functools import lru_cache
 from typing import Any, Optional, Union
 from dotenv import load_dotenv
 
@@ -32,9 +36,10 @@ from discord.ext import commands
 
 # Stable fork of Google Translate API
 from deep_translator import GoogleTranslator, single_detection
+from deep_translator.constants import GOOGLE_LANGUAGES_TO_CODES
 
 # Trig and rounding support for calculate command
-from math import floor, ceil, sqrt, pi, sin, cos, tan, asin, acos, atan, \
+from math import floor, ceil, sqrt, log10, pi, sin, cos, tan, asin, acos, atan, \
                 degrees as deg, radians as rad
 
 
@@ -62,41 +67,21 @@ def fetch_key(key_name: str,
         Union[str, int]: Returns the key as either a string or int or stops
         the program and returns an error message if the key isn't accessible.
     """
-    # Attempt to access the key
-    try:
-        key = os.getenv(key_name)
-    
-        # Handle nonexistent key
-        if key == None:
-            print(f"{err_msg}\nError: Key Does Not Exist")
-            raise SystemExit(err_code)
-    
-        # Converts key to int if necessary and returns
-        if to_int:
-            try:
-                return int(key)
-            except ValueError as e:
-                print(f"{err_msg}\nError: Concatenation Failed\n{e}")
-                raise SystemExit(err_code)
-        return key
-    # Handle unknown errors
-    except Exception as e:
-        print(f"{err_msg}\nError: Unknown\n{e}")
-        raise SystemExit(err_code)
+    key = os.getenv(key_name)
 
+    # Handle nonexistent key
+    if key is None:
+        print(f"{err_msg}\nError: Key Does Not Exist")
+        raise SystemExit(err_code)
 
-def key_from_value(dictionary: dict[Any, Any], 
-                value: Any) -> Union[str, None]:
-    """
-    Returns the key associated with a given value in a dictionary.
-    """
-    # Searches dictionary, returns key if found
-    for item in dictionary.items():
-        if value == item[1]:
-            return item[0]
-    
-    # Return None if key is not found
-    return None
+    # Converts key to int if necessary and returns
+    if to_int:
+        try:
+            return int(key)
+        except ValueError as e:
+            print(f"{err_msg}\nError: Concatenation Failed\n{e}")
+            raise SystemExit(err_code)
+    return key
 
 
 # Fetch keys
@@ -106,15 +91,82 @@ TOKEN = fetch_key("BOT_TOKEN", "BOT TOKEN ERROR", 1)
 ID = fetch_key("BOT_ID", "BOT ID ERROR", 2, True)
 TRANSLATE_API_KEY = fetch_key("LANGUAGE_DETECTION_API_KEY", "API KEY ERROR", 3)
 
-# Get supported languages for translation
-LANGUAGES = GoogleTranslator().get_supported_languages(as_dict=True)
+# Get supported languages for translation from deep_translator's static table
+LANGUAGES: dict[str, str] = dict(GOOGLE_LANGUAGES_TO_CODES)
+# Lookup of lowercase language names and codes to their language code
+LANG_CODE_MAP: dict[str, str] = {
+    **{name.lower(): code for name, code in LANGUAGES.items()},
+    **{code.lower(): code for code in LANGUAGES.values()},
+    # Special cases for Chinese
+    "chinese": "zh-CN",
+    "zh": "zh-CN",
+    "zh-cn": "zh-CN",
+    "zh-tw": "zh-TW",
+}
+# Set of supported language codes
+LANGUAGE_CODES: frozenset[str] = frozenset(LANGUAGES.values()) | {"zh-CN", "zh-TW"}
+# Lookup of language codes to their language name
+CODE_TO_NAME: dict[str, str] = {code: name for name, code in LANGUAGES.items()}
+CODE_TO_NAME["zh-CN"] = "chinese (simplified)"
+CODE_TO_NAME["zh-TW"] = "chinese (traditional)"
+# Translation table that removes italics/bolding from messages
+_STRIP_MARKUP = str.maketrans("", "", "*")
 # Max character length of a Discord message
 MAX_MESSAGE_LENGTH = 2000
+# Max character length of an equation passed to the calculate command
+MAX_EQUATION_LENGTH = 200
+# Max number of digits in any intermediate result of the calculate command
+MAX_RESULT_DIGITS = 1000
+
+# List of commands printed by the help command
+HELP_MESSAGE = """```
+LIST OF COMMANDS:
+==========================================================================================================
+| Name      | Command           | Usage                           | Description                          |
+|========================================================================================================|
+| Help      | -h                | -h                              | Print this message                   |
+| Translate | -t <translate_to> | Use while replying to a message | Translate a message                  |
+| Languages | -l                | -l                              | Prints a list of supported languages |
+| Calculate | -c <equation>     | -c <equation>                   | Calculate an arithmetic equation     |
+| Echo      | -e <string>       | -e <string>                     | Echo a message                       |
+```"""
+# Usage hint appended to translate command errors
+TRANSLATE_USAGE = "\nUsage: Reply to a message with `-t <language>`."
 
 # Create bot object
 bot = commands.Bot(command_prefix="-", intents=discord.Intents.all())
 
 
+async def _rl(coro_factory, *, retries: int = 3) -> Any:
+    """
+    Awaits a Discord API call, retrying it if it is rate limited.
+    
+    discord.py already sleeps through and retries most rate limits itself,
+    so this only handles the ones it gives up on.
+    
+    Args:
+        coro_factory (Callable[[], Awaitable]): Creates a fresh coroutine of
+        the API call for each attempt.
+        retries (int): Max number of retries before the error is raised.
+        
+    Returns:
+        Any: Result of the API call.
+    """
+    for attempt in range(retries + 1):
+        try:
+            return await coro_factory()
+        # Handles rate limits longer than discord.py is willing to wait
+        except discord.RateLimited as e:
+            if attempt == retries:
+                raise
+            await asyncio.sleep(e.retry_after)
+        # Handles 429s discord.py ran out of retries on, trying once more
+        except discord.HTTPException as e:
+            if e.status != 429 or attempt > 0:
+                raise
+            await asyncio.sleep(1)
+
+
 async def return_message(ctx, content: str) -> discord.Message:
     """
     Returns translation of a message in chunks of 2000 characters to prevent
@@ -124,10 +176,11 @@ async def return_message(ctx, content: str) -> discord.Message:
         Message(s) on Discord
     """
     # Make the first chunk a reply
-    await ctx.message.reply(content[0:MAX_MESSAGE_LENGTH])
-    # Send all other chunks
+    await _rl(lambda: ctx.message.reply(content[0:MAX_MESSAGE_LENGTH]))
+
+    # Send all other chunks in order, discord.py and _rl handle rate limits
     for i in range(MAX_MESSAGE_LENGTH, len(content), MAX_MESSAGE_LENGTH):
-        await ctx.send(content[i:i+MAX_MESSAGE_LENGTH])
+        await _rl(lambda: ctx.send(content[i:i+MAX_MESSAGE_LENGTH]))
 
 
 @bot.command()
@@ -137,17 +190,7 @@ async def h(ctx) -> discord.Message:
     descriptions.
     """
     # send message
-    return await ctx.message.reply("""```
-LIST OF COMMANDS:
-==========================================================================================================
-| Name      | Command           | Usage                           | Description                          |
-|========================================================================================================|
-| Help      | -h                | -h                              | Print this message                   |
-| Translate | -t <translate_to> | Use while replying to a message | Translate a message                  |
-| Languages | -l                | -l                              | Prints a list of supported languages |
-| Calculate | -c <equation>     | -c <equation>                   | Calculate an arithmetic equation     |
-| Echo      | -e <string>       | -e <string>                     | Echo a message                       |
-```""")
+    return await ctx.message.reply(HELP_MESSAGE)
 
 
 def get_lang_code(dest_lang: str) -> Union[str, None]:
@@ -162,25 +205,98 @@ def get_lang_code(dest_lang: str) -> Union[str, None]:
         Union[str, None]: User's destination language as a postal code or
         `None` if the language is not supported.
     """
-    dest_lang = dest_lang.lower()
+    # Fast path for the default destination language
+    if dest_lang == "en":
+        return "en"
+
+    # Return None if invalid language
+    return LANG_CODE_MAP.get(dest_lang.lower())
+
 
-    # Get language code
-    for l in LANGUAGES.items():
-        if dest_lang in l:
-            return l[1]
+# GoogleTranslator stores the text being translated on the instance, so each
+# worker thread keeps its own translators keyed by (source, target)
+_TRANSLATOR_CACHE = threading.local()
+
+
+def _get_translator(src: str, dest: str) -> GoogleTranslator:
+    """
+    Returns a reusable translator for a language pair, creating it on first
+    use in the current thread.
+    
+    Args:
+        src (str): Language code to translate from.
+        dest (str): Language code to translate to.
         
-    # Special cases for Chinese
-    if dest_lang == "chinese" or dest_lang == "zh":
-        return "zh-CN"
+    Returns:
+        GoogleTranslator: Translator for the given language pair.
+    """
+    translators: dict[tuple[str, str], GoogleTranslator] = \
+        _TRANSLATOR_CACHE.__dict__.setdefault("translators", {})
+
+    translator = translators.get((src, dest))
+    if translator is None:
+        translator = translators[(src, dest)] = GoogleTranslator(source=src, target=dest)
+    return translator
+
+
+@lru_cache(maxsize=1024)
+def _cached_detect(text: str) -> str:
+    """
+    Detects the language of a message, caching recent results.
     
-    elif dest_lang == "zh-tw":
-        return "zh-TW"
+    Args:
+        text (str): Message to detect the language of.
+        
+    Returns:
+        str: Detected language code.
+    """
+    return single_detection(text, api_key=TRANSLATE_API_KEY)
 
-    elif dest_lang == "zh-cn":
-        return "zh-CN"
+
+@lru_cache(maxsize=1024)
+def _cached_translate(src: str, dest: str, text: str) -> str:
+    """
+    Translates a message, caching recent results.
     
-    # Return None if invalid language
-    return None
+    Args:
+        src (str): Language code to translate from.
+        dest (str): Language code to translate to.
+        text (str): Message to translate.
+        
+    Returns:
+        str: Translated message.
+    """
+    return _get_translator(src, dest).translate(text)
+
+
+def _strip_translation_suffix(content: str) -> str:
+    """
+    Removes the "(Source -> Destination)" suffix the bot appends to its
+    translations.
+    
+    Args:
+        content (str): Message content, already stripped of whitespace.
+        
+    Returns:
+        str: Message content without the suffix, or unchanged if it has none.
+    """
+    arrow = content.rfind(" -> ")
+    if arrow == -1 or not content.endswith(")"):
+        return content
+
+    # Destination language sits between the arrow and the closing bracket
+    if content[arrow+4:-1].lower() not in LANGUAGES:
+        return content
+
+    # Source language names can contain brackets themselves, e.g.
+    # "Chinese (Simplified)", so check each opening bracket before the arrow
+    start = content.rfind("(", 0, arrow)
+    while start != -1:
+        if content[start+1:arrow].lower() in LANGUAGES:
+            return content[:start].strip()
+        start = content.rfind("(", 0, start)
+
+    return content
 
 
 @bot.command()
@@ -194,92 +310,108 @@ async def t(ctx, dest_lang: str = "en") -> discord.Message:
         english if no value is given.
     """
     try:
-        USAGE_ERROR = "\nUsage: Reply to a message with `-t <language>`."
-
         # Handles invalid execution
         if not ctx.message.reference:
-            return await ctx.message.reply(f"Error: No Message Found.{USAGE_ERROR}")
+            return await ctx.message.reply(f"Error: No Message Found.{TRANSLATE_USAGE}")
 
         # Get destination language
         dest_lang = get_lang_code(dest_lang)
 
         # Handles invalid destination language
         if dest_lang is None:
-            return await ctx.message.reply(f"Error: `{dest_lang}` is not a valid language.{USAGE_ERROR}")
+            return await ctx.message.reply(f"Error: `{dest_lang}` is not a valid language.{TRANSLATE_USAGE}")
 
         # Get replied message
         msg_id = ctx.message.reference.message_id
         msg = await ctx.channel.fetch_message(msg_id)
-        msg_content = msg.content.strip().replace("*", "")  # Removes italics/bolding
+        msg_content = msg.content.strip().translate(_STRIP_MARKUP)  # Removes italics/bolding
 
         # Remove translation suffix if it's a retranslation
         if msg.author.id == ID:
-            keys = "|".join(re.escape(key.title()) for key in LANGUAGES)
-            pattern = rf"\s*\((?:{keys}) -> (?:{keys})\)\s*"
-            msg_content = re.sub(pattern, "", msg_content).strip()
+            msg_content = _strip_translation_suffix(msg_content)
 
         # Handles empty message
         if not msg_content:
-            return await ctx.message.reply(f"Error: No Message Found.\n{USAGE_ERROR}")
+            return await ctx.message.reply(f"Error: No Message Found.\n{TRANSLATE_USAGE}")
 
         # Detect source language
-        src_lang = single_detection(msg_content, api_key=TRANSLATE_API_KEY)
+        src_lang = await asyncio.to_thread(_cached_detect, msg_content)
 
         # Special case for Chinese
         if src_lang == "zh":
             src_lang = "zh-CN"
         
         # Handles invalid source language
-        if src_lang not in LANGUAGES.values():
-            return await ctx.message.reply(f"Error: `{src_lang}` is not a supported source language.\n{USAGE_ERROR}")
+        if src_lang not in LANGUAGE_CODES:
+            return await ctx.message.reply(f"Error: `{src_lang}` is not a supported source language.\n{TRANSLATE_USAGE}")
 
         # Translate message
-        translated_msg = GoogleTranslator(source=src_lang, target=dest_lang).translate(msg_content)
+        translated_msg = await asyncio.to_thread(_cached_translate, src_lang, dest_lang, msg_content)
 
         # Handles API error
         if not translated_msg:
-            return await ctx.message.reply(f"Error: Translation failed.\n{USAGE_ERROR}")
+            return await ctx.message.reply(f"Error: Translation failed.\n{TRANSLATE_USAGE}")
 
         # Output translated text
-        return await return_message(ctx, f"**{translated_msg}** ({key_from_value(LANGUAGES, src_lang).title()} -> {key_from_value(LANGUAGES, dest_lang).title()})")
+        return await return_message(ctx, f"**{translated_msg}** ({CODE_TO_NAME[src_lang].title()} -> {CODE_TO_NAME[dest_lang].title()})")
     # Handles any other errors
     except Exception as e:
         print(f"Translation Error: {e}")
-        return await ctx.message.reply(f"Error: Unknown.\n{USAGE_ERROR}")
+        return await ctx.message.reply(f"Error: Unknown.\n{TRANSLATE_USAGE}")
 
 
-@bot.command()
-async def l(ctx) -> discord.Message:
+def _build_language_pages(per_page: int = 20) -> list[str]:
     """
-    Lists all the languages available for translation in pages, pagination
-    controlled by reactions.
+    Builds the pages of supported languages displayed by the languages
+    command.
+    
+    Args:
+        per_page (int): Number of languages listed on each page.
+        
+    Returns:
+        list[str]: Each page formatted as a Discord code block.
     """
     languages = list(LANGUAGES.items())
-    per_page = 20
     pages: list[str] = []
 
     # Appends pages to a list
     for i in range(0, len(languages), per_page):
         chunk = languages[i:i+per_page]
-        page_content = f"```SUPPORTED LANGUAGES ({i//per_page+1} of {ceil(len(languages)/per_page)}):\n=======================================\n"
-        page_content += "| Language              | Abbreviation |\n"
-        page_content += "|======================================|\n"
+        lines = [
+            f"```SUPPORTED LANGUAGES ({i//per_page+1} of {ceil(len(languages)/per_page)}):\n=======================================\n",
+            "| Language              | Abbreviation |\n",
+            "|======================================|\n",
+        ]
 
         # Uses ASCII art to neatly separate items
-        for key, value in chunk:
-            page_content += f"| {key.title():<21} | {value.upper():<12} |\n"
+        lines.extend(f"| {key.title():<21} | {value.upper():<12} |\n" for key, value in chunk)
+
+        lines.append("```")
+        pages.append("".join(lines))
+
+    return pages
 
-        page_content += "```"
-        pages.append(page_content)
+
+# Pages are constant since the supported languages never change at runtime
+LANGUAGE_PAGES: list[str] = _build_language_pages()
+
+
+@bot.command()
+async def l(ctx) -> discord.Message:
+    """
+    Lists all the languages available for translation in pages, pagination
+    controlled by reactions.
+    """
+    pages = LANGUAGE_PAGES
 
     # Page switching logic
     current_page = 0
-    message = await ctx.message.reply(pages[current_page])
+    message = await _rl(lambda: ctx.message.reply(pages[current_page]))
 
     # Adding reactions for navigation
     if len(pages) > 1:
-        await message.add_reaction("◀️")  # Back
-        await message.add_reaction("▶️")  # Forward
+        await _rl(lambda: message.add_reaction("◀️"))  # Back
+        await _rl(lambda: message.add_reaction("▶️"))  # Forward
 
 
         def check(reaction, user) -> bool:
@@ -300,7 +432,11 @@ async def l(ctx) -> discord.Message:
 
         # Adjusts page
         while True:
-            reaction, user = await bot.wait_for("reaction_add", check=check)
+            # Stops paginating once the user has been inactive for 2 minutes
+            try:
+                reaction, user = await bot.wait_for("reaction_add", check=check, timeout=120.0)
+            except asyncio.TimeoutError:
+                return await _rl(lambda: message.clear_reactions())
 
             if reaction.emoji == "▶️":
                 current_page += 1
@@ -308,9 +444,114 @@ async def l(ctx) -> discord.Message:
                 current_page -= 1
             
             # Edits message to display new languages and remove user reaction
-            new_page: list[str] = pages[current_page%len(pages)]
-            await message.edit(content=new_page)
-            await message.remove_reaction(reaction, user)
+            current_page %= len(pages)
+            new_page: str = pages[current_page]
+            await _rl(lambda: message.edit(content=new_page))
+            await _rl(lambda: message.remove_reaction(reaction, user))
+
+
+# Constants and functions allowed in equations passed to the calculate command
+_SAFE_NAMES = {
+    "pi": pi, "sqrt": sqrt, "floor": floor, "ceil": ceil,
+    "sin": sin, "cos": cos, "tan": tan, "asin": asin, "acos": acos,
+    "atan": atan, "deg": deg, "rad": rad,
+}
+# Smallest integer with more than MAX_RESULT_DIGITS digits
+_MAX_RESULT = 10 ** MAX_RESULT_DIGITS
+
+
+def _safe_pow(base: Union[int, float], exponent: Union[int, float]) -> Union[int, float]:
+    """
+    Raises a number to a power, refusing results too large to compute
+    quickly.
+    
+    Args:
+        base (Union[int, float]): Number being raised.
+        exponent (Union[int, float]): Power to raise the number to.
+        
+    Returns:
+        Union[int, float]: Result of the exponentiation.
+    """
+    # Estimates the number of digits in the result before computing it
+    if abs(base) > 1 and exponent > 0 and \
+            exponent * log10(abs(base)) > MAX_RESULT_DIGITS:
+        raise OverflowError("Result too large")
+    return base ** exponent
+
+
+def _check_size(value: Any) -> Any:
+    """
+    Checks that an intermediate result of an equation is within
+    MAX_RESULT_DIGITS.
+    
+    Args:
+        value (Any): Result to check.
+        
+    Returns:
+        Any: The result, unchanged.
+    """
+    if isinstance(value, int) and abs(value) >= _MAX_RESULT:
+        raise OverflowError("Result too large")
+    return value
+
+
+# Operators allowed in equations passed to the calculate command
+_BINARY_OPERATORS = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+    ast.Div: operator.truediv, ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod, ast.Pow: _safe_pow,
+}
+_UNARY_OPERATORS = {ast.USub: operator.neg, ast.UAdd: operator.pos}
+
+
+def _eval_node(node: ast.AST) -> Any:
+    """
+    Recursively evaluates a node of a parsed equation, only allowing
+    arithmetic and whitelisted math functions.
+    
+    Args:
+        node (ast.AST): Node to evaluate.
+        
+    Returns:
+        Any: Value of the node.
+    """
+    if isinstance(node, ast.Expression):
+        return _eval_node(node.body)
+
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        return node.value
+
+    if isinstance(node, ast.Name):
+        if node.id not in _SAFE_NAMES:
+            raise NameError(f"name '{node.id}' is not defined")
+        return _SAFE_NAMES[node.id]
+
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATORS:
+        result = _BINARY_OPERATORS[type(node.op)](_eval_node(node.left), _eval_node(node.right))
+        return _check_size(result)
+
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPERATORS:
+        return _UNARY_OPERATORS[type(node.op)](_eval_node(node.operand))
+
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+        return _eval_node(node.func)(*[_eval_node(arg) for arg in node.args])
+
+    # Rejects anything that isn't plain arithmetic
+    raise SyntaxError(f"Unsupported expression: {type(node).__name__}")
+
+
+@lru_cache(maxsize=512)
+def _evaluate_eq(eq: str) -> Any:
+    """
+    Parses and evaluates an equation, caching recent results.
+    
+    Args:
+        eq (str): Equation to evaluate.
+        
+    Returns:
+        Any: Result of the equation.
+    """
+    return _eval_node(ast.parse(eq, mode="eval"))
 
 
 @bot.command()
@@ -327,14 +568,22 @@ async def c(ctx, *equation) -> discord.Message:
         if not eq:
             return await ctx.message.reply("Error: No Equation Found.\nUsage: `-c <equation>`")
 
+        # Handles equations that are too long
+        if len(eq) > MAX_EQUATION_LENGTH:
+            return await ctx.message.reply("Error: Equation too long.\nUsage: `-c <equation>`")
+
         # Calculate and return total rounded to 5 decimals
-        return await ctx.message.reply(f"Total: **{round(eval(eq), 5)}**")
+        total = _evaluate_eq(eq)
+        return await ctx.message.reply(f"Total: **{round(total, 5)}**")
+    # Handles results too large to compute
+    except OverflowError:
+        return await ctx.message.reply("Error: Result Too Large.\nUsage: `-c <equation>`")
     # Handles domain error
     except ValueError:
         return await ctx.message.reply("Undefined")
     # Handles unknown function error
     except NameError as e:
-        return await ctx.message.reply(f'Unknown Function: "{e.split()[1][1:-1]}"')
+        return await ctx.message.reply(f'Unknown Function: "{str(e).split()[1][1:-1]}"')
     # Handles unknown error
     except Exception as e:
         print(e)